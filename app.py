@@ -1,6 +1,7 @@
 import streamlit as st
-import pandas as pd
-import json
+import numpy as np
+import orjson
+from numba import njit
 
 # --- Page Config ---
 st.set_page_config(page_title="Trade Tracker", page_icon="📈", layout="wide")
@@ -9,13 +10,130 @@ st.title("📊 Trade Tracker")
 st.caption("Log your trades, track performance, and analyze results.")
 
 # --- Helper to Load Trades from JSON ---
+def backup_to_rows(data):
+    if isinstance(data, dict):
+        # Column-oriented backup (current save format).
+        return [
+            {"Buy": b, "Sell": s, "Fee (%)": f, "Color": c}
+            for b, s, f, c in zip(
+                data["Buy"], data["Sell"], data["Fee (%)"], data["Color"]
+            )
+        ]
+    # Legacy list-of-dicts backup.
+    return [
+        {"Buy": t["Buy"], "Sell": t["Sell"],
+         "Fee (%)": t["Fee (%)"], "Color": t["Color"]}
+        for t in data
+    ]
+
 def load_trades(uploaded_file):
     try:
-        data = json.load(uploaded_file)
-        st.session_state["loaded_trades"] = data
+        data = orjson.loads(uploaded_file.getvalue())
+        # Convert once here rather than on every rerun in tab1.
+        st.session_state["editor_rows"] = backup_to_rows(data)
+        # Force the trade editor to re-seed from the loaded rows.
+        st.session_state["editor_version"] = st.session_state.get("editor_version", 0) + 1
         st.success("✅ Trades successfully loaded!")
+        return True
     except Exception as e:
         st.error(f"Failed to load trades: {e}")
+        return False
+
+# --- Portfolio Recurrence ---
+@njit(cache=True)
+def portfolio_recurrence(buy, sell, fee):
+    """Run the sequential portfolio recurrence over ascending trades.
+
+    Each step depends on the previous portfolio value, so this cannot be
+    vectorized; Numba compiles the loop to native code instead. Returns
+    (portfolio_value, total_added_capital).
+    """
+    portfolio_value = 0.0
+    prev_portfolio = 0.0
+    total_added_capital = 0.0
+
+    for k in range(buy.shape[0]):
+        net_result = (sell[k] - buy[k]) - (sell[k] * fee[k] / 100)
+
+        if k == 0:
+            prev_portfolio = buy[k]
+            portfolio_value = buy[k] + net_result
+        else:
+            if buy[k] > prev_portfolio:
+                added_capital = buy[k] - prev_portfolio
+                total_added_capital += added_capital
+            else:
+                added_capital = 0.0
+            portfolio_value = prev_portfolio - buy[k] + net_result + added_capital
+        prev_portfolio = portfolio_value
+
+    return portfolio_value, total_added_capital
+
+# --- Overview Helpers ---
+TRADE_COLUMNS = [
+    "Trade", "Buy", "Sell", "Fee (%)",
+    "Profit", "ROI (%)", "Total Return", "Color"
+]
+
+@st.cache_data
+def build_df(columns_tuple):
+    # pandas is only needed once the overview actually renders; importing
+    # here keeps it off the critical path of tab1 reruns and app startup.
+    import pandas as pd
+
+    # Arrow-backed columns let st.dataframe serialize to the browser
+    # without a pandas->Arrow conversion copy on every render; the
+    # dtypes are explicit so the schema never depends on the data.
+    df = pd.DataFrame(dict(zip(TRADE_COLUMNS, columns_tuple)))
+    df = df.astype({
+        "Trade": "int32[pyarrow]",
+        "Buy": "float64[pyarrow]",
+        "Sell": "float64[pyarrow]",
+        "Fee (%)": "float64[pyarrow]",
+        "Profit": "float64[pyarrow]",
+        "ROI (%)": "float64[pyarrow]",
+        "Total Return": "float64[pyarrow]",
+        "Color": pd.CategoricalDtype(["default", "red", "blue"]),
+    })
+    # Trades arrive in ascending order (editor row order), so no sort needed.
+    df["Portfolio Value"] = pd.array(
+        df["Buy"].to_numpy().cumsum() + df["Profit"].to_numpy().cumsum(),
+        dtype="float64[pyarrow]",
+    )
+    return df
+
+def format_table(df_input):
+    return df_input.style.format({
+        "Buy": "${:,.2f}",
+        "Sell": "${:,.2f}",
+        "Profit": "${:,.2f}",
+        "Total Return": "${:,.2f}",
+        "Portfolio Value": "${:,.2f}",
+        "ROI (%)": "{:,.2f}%",
+        "Fee (%)": "{:,.2f}%",
+    })
+
+def show_charts(df_subset, label="All Trades"):
+    import altair as alt
+
+    st.markdown(f"### {label}")
+    base = alt.Chart(df_subset).encode(
+        x=alt.X(field="Trade", type="ordinal", title="Trade")
+    )
+    profit_bars = base.mark_bar().encode(
+        y=alt.Y(field="Profit", type="quantitative", title="Profit ($)")
+    ).properties(title="💰 Profit per Trade")
+    portfolio_line = base.mark_line(point=True).encode(
+        y=alt.Y(field="Portfolio Value", type="quantitative", title="Portfolio Value ($)")
+    ).properties(title="💼 Portfolio Value Growth")
+    roi_bars = base.mark_bar().encode(
+        y=alt.Y(field="ROI (%)", type="quantitative", title="ROI (%)")
+    ).properties(title="📈 ROI per Trade (%)")
+
+    st.altair_chart(
+        alt.vconcat(profit_bars, portfolio_line, roi_bars),
+        use_container_width=True,
+    )
 
 # --- Tabs ---
 tab1, tab2 = st.tabs(["💼 Trade Tracker", "📈 Overview"])
@@ -23,75 +141,87 @@ tab1, tab2 = st.tabs(["💼 Trade Tracker", "📈 Overview"])
 # ======================================================
 # TAB 1: TRADE TRACKER
 # ======================================================
-with tab1:
+@st.fragment
+def render_tracker():
     left, right = st.columns([3, 1])
 
     with left:
-        # Load previous trades if available
-        if "loaded_trades" in st.session_state:
-            prev_trades = st.session_state["loaded_trades"]
-            num_trades = len(prev_trades)
-        else:
-            prev_trades = []
-            num_trades = 1
+        # Seed the editor from a loaded backup if one exists; the
+        # conversion already happened once inside load_trades.
+        initial_rows = st.session_state.get(
+            "editor_rows",
+            [{"Buy": 0.0, "Sell": 0.0, "Fee (%)": 0.0, "Color": "default"}],
+        )
 
-        num_trades = st.number_input(
-            "How many trades did you make?", min_value=1, max_value=50, value=num_trades, step=1
+        st.markdown("Enter one row per trade:")
+
+        # The key changes whenever a backup is loaded so the editor picks
+        # up the new initial rows instead of its stale widget state.
+        edited_rows = st.data_editor(
+            initial_rows,
+            num_rows="dynamic",
+            use_container_width=True,
+            key=f"trade_editor_{st.session_state.get('editor_version', 0)}",
+            column_config={
+                "Buy": st.column_config.NumberColumn(
+                    "Buy Price", min_value=0.0, step=0.01, format="$%.2f"
+                ),
+                "Sell": st.column_config.NumberColumn(
+                    "Sell Price", min_value=0.0, step=0.01, format="$%.2f"
+                ),
+                "Fee (%)": st.column_config.NumberColumn(
+                    "Market Fee (%)", min_value=0.0, step=0.1, format="%.2f%%"
+                ),
+                "Color": st.column_config.SelectboxColumn(
+                    "Color", options=["default", "red", "blue"]
+                ),
+            },
         )
 
-        st.divider()
+        num_trades = len(edited_rows)
 
-        trades = []
-        total_profit = 0.0
-        total_investment = 0.0
-        portfolio_value = 0.0
-
-        for i in reversed(range(1, num_trades + 1)):
-            prev = next((t for t in prev_trades if t["Trade"] == i), None)
-            with st.expander(f"Trade {i}", expanded=True):
-                col1, col2, col3, col4 = st.columns([1, 1, 1, 1])
-
-                with col1:
-                    buy_price = st.number_input(
-                        "Buy Price", min_value=0.0, step=0.01, key=f"buy_{i}",
-                        value=prev["Buy"] if prev else 0.0
-                    )
-                with col2:
-                    sell_price = st.number_input(
-                        "Sell Price", min_value=0.0, step=0.01, key=f"sell_{i}",
-                        value=prev["Sell"] if prev else 0.0
-                    )
-                with col3:
-                    fee = st.number_input(
-                        "Market Fee (%)", min_value=0.0, step=0.1, key=f"fee_{i}",
-                        value=prev["Fee (%)"] if prev else 0.0
-                    )
-                with col4:
-                    color = st.selectbox(
-                        "Color", ["default", "red", "blue"], key=f"color_{i}",
-                        index=(["default", "red", "blue"].index(prev["Color"]) if prev else 0)
-                    )
-
-                # --- Calculations ---
-                profit = (sell_price - buy_price) - (sell_price * fee / 100)
-                roi = (profit / buy_price * 100) if buy_price > 0 else 0
-                total_return = sell_price - (sell_price * fee / 100)
-
-                total_profit += profit
-                total_investment += buy_price
-
-                trades.append({
-                    "Trade": i,
-                    "Buy": buy_price,
-                    "Sell": sell_price,
-                    "Fee (%)": fee,
-                    "Profit": profit,
-                    "ROI (%)": roi,
-                    "Total Return": total_return,
-                    "Color": color
-                })
+        # --- Calculations (vectorized, ascending trade order) ---
+        buy_arr = np.fromiter(
+            ((r.get("Buy") or 0.0) for r in edited_rows),
+            dtype=np.float64, count=num_trades
+        )
+        sell_arr = np.fromiter(
+            ((r.get("Sell") or 0.0) for r in edited_rows),
+            dtype=np.float64, count=num_trades
+        )
+        fee_arr = np.fromiter(
+            ((r.get("Fee (%)") or 0.0) for r in edited_rows),
+            dtype=np.float64, count=num_trades
+        )
+        colors = [r.get("Color") or "default" for r in edited_rows]
+
+        profit_arr = (sell_arr - buy_arr) - (sell_arr * fee_arr / 100)
+        roi_arr = np.zeros_like(profit_arr)
+        np.divide(profit_arr, buy_arr, where=buy_arr > 0, out=roi_arr)
+        roi_arr *= 100
+        total_return_arr = sell_arr - (sell_arr * fee_arr / 100)
+
+        total_profit = float(profit_arr.sum())
+        total_investment = float(buy_arr.sum())
+
+        # Structure-of-arrays: one array per column, ascending trade order.
+        trades = {
+            "Trade": np.arange(1, num_trades + 1),
+            "Buy": buy_arr,
+            "Sell": sell_arr,
+            "Fee (%)": fee_arr,
+            "Profit": profit_arr,
+            "ROI (%)": roi_arr,
+            "Total Return": total_return_arr,
+            "Color": np.array(colors),
+        }
 
         # Save to session for other tab
+        old_trades = st.session_state.get("trades")
+        trades_changed = old_trades is not None and (
+            set(old_trades) != set(trades)
+            or any(not np.array_equal(trades[k], old_trades[k]) for k in trades)
+        )
         st.session_state["trades"] = trades
 
     with right:
@@ -99,31 +229,11 @@ with tab1:
         st.divider()
 
         # --- Portfolio Logic ---
-        portfolio_value = 0.0
-        prev_portfolio = 0.0
-        total_added_capital = 0.0
-        initialized = False
-
-        for t in reversed(trades):
-            buy = t["Buy"]
-            sell = t["Sell"]
-            fee = t["Fee (%)"]
-            net_result = (sell - buy) - (sell * fee / 100)
-
-            if not initialized:
-                prev_portfolio = buy
-                portfolio_value = buy + net_result
-                initialized = True
-            else:
-                if buy > prev_portfolio:
-                    added_capital = buy - prev_portfolio
-                    total_added_capital += added_capital
-                else:
-                    added_capital = 0
-                portfolio_value = prev_portfolio - buy + net_result + added_capital
-            prev_portfolio = portfolio_value
+        portfolio_value, total_added_capital = portfolio_recurrence(
+            buy_arr, sell_arr, fee_arr
+        )
 
-        effective_invested = (trades[-1]["Buy"] if trades else 0) + total_added_capital
+        effective_invested = (float(buy_arr[0]) if num_trades else 0) + total_added_capital
         total_roi = ((portfolio_value / effective_invested) - 1) * 100 if effective_invested > 0 else 0
 
         st.metric("💰 Total Profit", f"${total_profit:,.2f}")
@@ -135,7 +245,12 @@ with tab1:
 
         # --- Save Button ---
         if st.button("💾 Save Trades"):
-            json_data = json.dumps(trades, indent=4)
+            # tolist() per column: OPT_SERIALIZE_NUMPY can't handle the
+            # unicode Color array, only numeric/bool/datetime dtypes.
+            json_data = orjson.dumps(
+                {k: np.asarray(v).tolist() for k, v in trades.items()},
+                option=orjson.OPT_INDENT_2,
+            )
             st.download_button(
                 "⬇️ Download JSON File",
                 data=json_data,
@@ -146,51 +261,47 @@ with tab1:
         # --- Load Button ---
         uploaded = st.file_uploader("📂 Upload Saved Trades (.json)", type=["json"])
         if uploaded is not None:
-            load_trades(uploaded)
+            # Only parse when the uploaded bytes actually change; the
+            # uploader keeps returning the same file on every rerun.
+            upload_hash = hash(uploaded.getvalue())
+            if st.session_state.get("loaded_hash") != upload_hash:
+                # Only remember the hash on success so a corrupt file
+                # keeps reporting its error until it is replaced.
+                if load_trades(uploaded):
+                    st.session_state["loaded_hash"] = upload_hash
+
+    # A fragment rerun doesn't re-execute the overview, so push changed
+    # trades out with a full-app rerun to keep tab2 in sync. The follow-up
+    # run sees identical trades and doesn't loop.
+    if trades_changed:
+        st.rerun(scope="app")
+
+with tab1:
+    render_tracker()
 
 # ======================================================
 # TAB 2: OVERVIEW
 # ======================================================
-with tab2:
+@st.fragment
+def render_overview():
     st.header("📋 Trade Overview")
-    trades = st.session_state.get("trades", [])
+    trades = st.session_state.get("trades", {})
 
     if not trades:
         st.info("No trades added yet. Go to the Trade Tracker tab to enter your trades.")
     else:
-        df = pd.DataFrame(trades)
-        df = df.sort_values(by="Trade", ascending=True).reset_index(drop=True)
+        df = build_df(tuple(tuple(np.asarray(trades[c]).tolist()) for c in TRADE_COLUMNS))
 
         st.subheader("📊 Performance View")
         mode = st.radio("View Mode:", ["All Trades", "Split by Color"], horizontal=True)
 
-        def format_table(df_input):
-            df_display = df_input.copy()
-            df_display["Buy"] = df_display["Buy"].map("${:,.2f}".format)
-            df_display["Sell"] = df_display["Sell"].map("${:,.2f}".format)
-            df_display["Profit"] = df_display["Profit"].map("${:,.2f}".format)
-            df_display["Total Return"] = df_display["Total Return"].map("${:,.2f}".format)
-            df_display["ROI (%)"] = df_display["ROI (%)"].map("{:,.2f}%".format)
-            df_display["Fee (%)"] = df_display["Fee (%)"].map("{:,.2f}%".format)
-            return df_display
-
-        def show_charts(df_subset, label="All Trades"):
-            st.markdown(f"### {label}")
-            chart_df = df_subset.sort_values(by="Trade", ascending=True)
-            chart_df["Portfolio Value"] = chart_df["Buy"].cumsum() + chart_df["Profit"].cumsum()
-            st.markdown("**💰 Profit per Trade**")
-            st.bar_chart(chart_df.set_index("Trade")["Profit"])
-            st.markdown("**💼 Portfolio Value Growth**")
-            st.line_chart(chart_df.set_index("Trade")["Portfolio Value"])
-            st.markdown("**📈 ROI per Trade (%)**")
-            st.bar_chart(chart_df.set_index("Trade")["ROI (%)"])
-
         if mode == "All Trades":
             st.dataframe(format_table(df), use_container_width=True)
             show_charts(df)
         else:
-            red_df = df[df["Color"] == "red"]
-            blue_df = df[df["Color"] == "blue"]
+            color_groups = {k: g for k, g in df.groupby("Color", sort=False)}
+            red_df = color_groups.get("red", df.iloc[0:0])
+            blue_df = color_groups.get("blue", df.iloc[0:0])
 
             st.markdown("### 🔍 Trade Tables by Color")
             col1, col2 = st.columns(2)
@@ -222,3 +333,6 @@ with tab2:
                     st.info("No blue trades available.")
 
         st.caption("Charts and tables update automatically as you adjust or load your trades.")
+
+with tab2:
+    render_overview()